@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, send_file, Response
 from flask_cors import CORS
 import plotly
 import numpy as np
@@ -6,8 +6,17 @@ import re
 import os
 import json
 import time
+import base64
+import csv
+import io
+import sys
 from datetime import datetime
 from models import db, Chat
+from sqlalchemy import func, tuple_, text
+from summary_stats import ColumnProfile, profile_chunks
+from chart_render import ChartRenderer, THUMBNAIL_FORMATS
+from chart_store import ChartBlobStore
+from result_spill import SpillStore, SpilledResult
 
 # --- PostgreSQL ---
 import psycopg2
@@ -125,26 +134,86 @@ def setup_database():
         return False
 
 # --- PostgreSQL Helper ---
-def get_data_from_postgres(query):
+def stream_data_from_postgres(query, chunk_size=5000):
+    """Yield query results in chunks of row dicts using a server-side cursor"""
+    conn = connection_pool.getconn()
     try:
-        conn = connection_pool.getconn()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Execute the query as-is without automatic LIMIT addition
+        cur = conn.cursor(name=f"chartbot_stream_{int(time.time() * 1000)}", cursor_factory=RealDictCursor)
+        cur.itersize = chunk_size
         cur.execute(query)
-        rows = cur.fetchall()
-        
-        # Convert RealDictRow to regular dict
-        result = []
-        for row in rows:
-            result.append(dict(row))
-        
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield [dict(row) for row in rows]
         cur.close()
+    finally:
+        conn.rollback()
         connection_pool.putconn(conn)
-        return result
+
+# --- Spill-to-disk for oversized results ---
+# Results estimated above this size are written to memory-mapped column files
+SPILL_THRESHOLD_BYTES = 64 * 1024 * 1024
+# Rows of a spilled result sent back inline with the chat response
+SPILL_PREVIEW_ROWS = 100
+# Maximum points in a chart built from a spilled result
+MAX_SPILLED_CHART_POINTS = 500
+SPILL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'result_spill')
+spill_store = SpillStore(SPILL_DIR, ttl=3600)
+spill_store.start_cleanup_timer()
+
+def estimate_row_bytes(rows):
+    """Rough in-memory size of a row dict, averaged over a sample"""
+    sample = rows[:100]
+    total = sum(sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row.values()) for row in sample)
+    return total / len(sample)
+
+def fetch_query_result(query, chunk_size=5000):
+    """Execute a query, keeping rows in memory unless they exceed SPILL_THRESHOLD_BYTES.
+
+    Returns a list of row dicts, a SpilledResult for oversized results, or
+    None if the query failed.
+    """
+    writer = None
+    try:
+        rows = []
+        row_bytes = None
+        for chunk in stream_data_from_postgres(query, chunk_size):
+            if writer is not None:
+                writer.write(chunk)
+                continue
+            rows.extend(chunk)
+            if row_bytes is None:
+                row_bytes = estimate_row_bytes(rows)
+            if len(rows) * row_bytes > SPILL_THRESHOLD_BYTES:
+                writer = spill_store.writer(rows)
+                writer.write(rows)
+                rows = []
+        if writer is not None:
+            return writer.close()
+        return rows
+    except Exception as e:
+        print(f"PostgreSQL error: {e}")
+        if writer is not None:
+            writer.close()
+            spill_store.discard(writer.result_id)
+        return None
+
+def count_query_rows(query):
+    """Count a query's rows in the database, without transferring them"""
+    conn = connection_pool.getconn()
+    try:
+        cur = conn.cursor()
+        cur.execute(f"SELECT count(*) FROM ({query.strip().rstrip(';')}) AS q")
+        count = cur.fetchone()[0]
+        cur.close()
+        return count
     except Exception as e:
         print(f"PostgreSQL error: {e}")
         return None
+    finally:
+        conn.rollback()
+        connection_pool.putconn(conn)
 
 # --- SQL Query Detection ---
 def is_sql_query(message):
@@ -156,10 +225,15 @@ def is_sql_query(message):
 # --- Data Analysis for Chart Creation ---
 def analyze_data_for_chart(data, chart_type):
     """Analyze data structure and create appropriate chart data"""
-    if not data or len(data) == 0:
+    spilled = isinstance(data, SpilledResult)
+    if spilled:
+        if data.row_count == 0:
+            return None
+        first_row = data.rows(0, 1)[0]
+    elif not data or len(data) == 0:
         return None
-    
-    first_row = data[0]
+    else:
+        first_row = data[0]
     columns = list(first_row.keys())
     
     # Find the best columns for visualization
@@ -198,28 +272,44 @@ def analyze_data_for_chart(data, chart_type):
     labels = []
     values = []
     
-    for row in data:
-        label = str(row.get(label_column, ''))
-        try:
-            value = float(row.get(value_column, 0))
-        except (ValueError, TypeError):
-            value = 0
-        
-        labels.append(label)
-        values.append(value)
+    aggregation = None
+    if spilled:
+        # Never one point per spilled row: sum per label when there are few
+        # enough distinct labels, otherwise average runs of consecutive rows
+        grouped = data.group_sum(label_column, value_column, MAX_SPILLED_CHART_POINTS)
+        if grouped is not None:
+            labels, values = grouped
+            aggregation = f"sum per {label_column}"
+        else:
+            labels, values = data.bucket_means(label_column, value_column, MAX_SPILLED_CHART_POINTS)
+            aggregation = f"average of {data.row_count} rows in {len(values)} buckets"
+    else:
+        for row in data:
+            label = str(row.get(label_column, ''))
+            try:
+                value = float(row.get(value_column, 0))
+            except (ValueError, TypeError):
+                value = 0
+            
+            labels.append(label)
+            values.append(value)
     
     # Generate colors
     colors = generate_colors(chart_type, len(values))
     
     # Create title
     title = f"{chart_type.title()} Chart: {value_column} by {label_column}"
+    if aggregation:
+        title += f" ({aggregation})"
     
     return {
         "type": chart_type,
         "labels": labels,
         "values": values,
         "colors": colors,
-        "title": title
+        "title": title,
+        "labelColumn": label_column,
+        "valueColumn": value_column
     }
 
 def generate_colors(chart_type, count):
@@ -353,7 +443,7 @@ def chat():
             })
         
         # Execute SQL query
-        query_result = get_data_from_postgres(message)
+        query_result = fetch_query_result(message)
         
         if query_result is None:
             return jsonify({
@@ -361,24 +451,39 @@ def chat():
                 "error": "Failed to execute SQL query. Please check your syntax and try again."
             })
         
-        if len(query_result) == 0:
+        if isinstance(query_result, SpilledResult):
+            # Oversized result: send a preview and let charts/exports read the spilled copy
+            row_count = query_result.row_count
+            data_rows = query_result.rows(0, SPILL_PREVIEW_ROWS)
+        else:
+            row_count = len(query_result)
+            data_rows = query_result
+        
+        if row_count == 0:
             return jsonify({
                 "success": False,
                 "error": "Query executed successfully but returned no data."
             })
         
         # Analyze data and suggest chart types
-        chart_suggestions = analyze_data_for_chart_suggestions(query_result)
+        chart_suggestions = analyze_data_for_chart_suggestions(data_rows)
         
-        # Return data with chart suggestions
-        return jsonify({
+        response = {
             "success": True,
             "type": "sql_result",
-            "data": query_result,
-            "message": f"Great! I found {len(query_result)} records from your query. Please choose how you'd like to visualize this data:",
+            "data": data_rows,
+            "message": f"Great! I found {row_count} records from your query. Please choose how you'd like to visualize this data:",
             "query": message,
             "chart_suggestions": chart_suggestions
-        })
+        }
+        if isinstance(query_result, SpilledResult):
+            response["result_id"] = query_result.result_id
+            response["row_count"] = row_count
+            response["truncated"] = True
+            response["message"] += f" (showing the first {len(data_rows)} rows here; charts and exports use all {row_count})"
+        
+        # Return data with chart suggestions
+        return jsonify(response)
     
     else:
         # Handle regular chat - provide helpful SQL examples
@@ -395,6 +500,16 @@ def create_chart():
     sql_data = data.get('data', [])
     sql_query = data.get('query', '')
     
+    # Spilled results are charted from disk instead of the posted preview rows
+    result_id = data.get('result_id')
+    if result_id:
+        sql_data = spill_store.open(result_id)
+        if sql_data is None:
+            return jsonify({
+                "success": False,
+                "error": "Query result has expired. Please run the query again."
+            })
+    
     if not sql_data:
         return jsonify({
             "success": False,
@@ -414,7 +529,7 @@ def create_chart():
     chart_data["sqlQuery"] = sql_query
     
     # Generate chart visualization data
-    visualization_data = generate_chart_visualization(chart_data, chart_type)
+    visualization_data = generate_chart_visualization(chart_data, chart_type, sql_data)
     
     return jsonify({
         "success": True,
@@ -423,7 +538,7 @@ def create_chart():
         "message": f"Here's your {chart_type} chart visualization:"
     })
 
-def generate_chart_visualization(chart_data, chart_type):
+def generate_chart_visualization(chart_data, chart_type, rows=None):
     """Generate visualization data for different chart types"""
     if chart_type == "bar":
         return {
@@ -539,21 +654,33 @@ def generate_chart_visualization(chart_data, chart_type):
         }
     
     elif chart_type == "summary":
-        total = sum(chart_data["values"])
-        avg = total / len(chart_data["values"]) if chart_data["values"] else 0
-        max_val = max(chart_data["values"]) if chart_data["values"] else 0
-        min_val = min(chart_data["values"]) if chart_data["values"] else 0
+        columns = profile_chunks(
+            rows.iter_chunks() if isinstance(rows, SpilledResult) else [rows],
+            label_column=chart_data.get("labelColumn")
+        )["columns"] if rows else {}
+        if isinstance(rows, SpilledResult) and chart_data.get("valueColumn") in columns:
+            # chart_data["values"] holds per-label aggregates for spilled results,
+            # so report the full-data profile of the value column instead
+            stats = columns[chart_data["valueColumn"]]
+            count = rows.row_count
+        else:
+            stats = ColumnProfile("value", top_k=3).update(chart_data["values"], chart_data["labels"]).to_dict()
+            count = len(chart_data["values"])
+        has_values = stats["count"] > 0
         
         return {
             "type": "summary",
             "data": {
-                "total": total,
-                "average": round(avg, 2),
-                "maximum": max_val,
-                "minimum": min_val,
-                "count": len(chart_data["values"]),
-                "top_categories": sorted(zip(chart_data["labels"], chart_data["values"]), 
-                                       key=lambda x: x[1], reverse=True)[:3]
+                "total": stats["total"],
+                "average": round(stats["mean"], 2) if has_values else 0,
+                "maximum": stats["maximum"] if has_values else 0,
+                "minimum": stats["minimum"] if has_values else 0,
+                "count": count,
+                "top_categories": stats["top"],
+                "stddev": stats["stddev"],
+                "quantiles": stats["quantiles"],
+                "histogram": stats["histogram"],
+                "columns": columns
             }
         }
     
@@ -570,6 +697,65 @@ def generate_chart_visualization(chart_data, chart_type):
             }
         }
 
+@app.route('/api/profile', methods=['POST'])
+def profile_query():
+    """Profile every numeric column of a SELECT query without loading it all into memory"""
+    data = request.get_json()
+    query = data.get('query', '').strip()
+    if not query.lower().startswith('select'):
+        return jsonify({
+            "success": False,
+            "error": "Only SELECT queries are allowed for security reasons. Please start your query with SELECT."
+        })
+    try:
+        chunk_size = int(data.get('chunkSize', 5000))
+        top_k = int(data.get('topK', 3))
+        bins = int(data.get('bins', 10))
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "error": "chunkSize, topK and bins must be integers"}), 400
+    if min(chunk_size, top_k, bins) < 1:
+        return jsonify({"success": False, "error": "chunkSize, topK and bins must be positive"}), 400
+    try:
+        profile = profile_chunks(
+            stream_data_from_postgres(query, chunk_size),
+            label_column=data.get('labelColumn'),
+            top_k=top_k,
+            bins=bins
+        )
+    except psycopg2.Error as e:
+        print(f"PostgreSQL error: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Failed to execute SQL query. Please check your syntax and try again."
+        })
+    return jsonify({
+        "success": True,
+        "query": query,
+        "profile": profile
+    })
+
+@app.route('/api/results/<result_id>/export', methods=['GET'])
+def export_result(result_id):
+    """Stream a spilled query result as CSV straight from its memory-mapped columns"""
+    result = spill_store.open(result_id)
+    if result is None:
+        return jsonify({'error': 'Query result not found or expired'}), 404
+
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(result.columns)
+        for chunk in result.iter_chunks():
+            writer.writerows([row[col] for col in result.columns] for row in chunk)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+        yield buffer.getvalue()
+
+    return Response(generate(), mimetype='text/csv', headers={
+        'Content-Disposition': f'attachment; filename="result_{result_id}.csv"'
+    })
+
 # Health check endpoint
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -597,6 +783,80 @@ def health_check():
 CHAT_HISTORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chat_history')
 os.makedirs(CHAT_HISTORY_DIR, exist_ok=True)
 
+# Server-side chart thumbnails, cached on disk by content hash
+CHART_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chart_cache')
+chart_renderer = ChartRenderer(CHART_CACHE_DIR)
+
+# Saved chart payloads, stored once by content hash and referenced from history
+CHART_BLOB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chart_blobs')
+chart_blobs = ChartBlobStore(CHART_BLOB_DIR)
+
+def thumbnail_urls(chart_hash):
+    """Return URLs for the thumbnails of a chart that have finished rendering"""
+    return {
+        fmt: f"/api/charts/thumbnails/{chart_hash}.{fmt}"
+        for fmt in THUMBNAIL_FORMATS
+        if chart_renderer.is_rendered(chart_hash, fmt)
+    }
+
+def generate_bot_response(user_message):
+    """Generate the bot reply for a chat message using the same logic as /api/chat"""
+    if is_sql_query(user_message):
+        message_lower = user_message.lower().strip()
+        if not message_lower.startswith('select'):
+            return "Only SELECT queries are allowed for security reasons. Please start your query with SELECT."
+        # Only the row count is reported here, so nothing needs to be kept
+        row_count = count_query_rows(user_message)
+        if row_count is None:
+            return "Failed to execute SQL query. Please check your syntax and try again."
+        if row_count == 0:
+            return "Query executed successfully but returned no data."
+        return f"Great! I found {row_count} records from your query. Please choose how you'd like to visualize this data:"
+    return "Please enter a SQL query to fetch data from your PostgreSQL database. Here are some examples:\n\n• SELECT * FROM sales_table LIMIT 10\n• SELECT category, SUM(amount) as total FROM sales_table GROUP BY category\n• SELECT month, COUNT(*) as count FROM orders GROUP BY month\n\nI'll help you create beautiful visualizations once you provide the data!"
+
+def chart_visualization_for(chart_data, visualization=None):
+    """Find the visualization payload to render for a saved chart.
+
+    Uses, in order: an explicit ``visualization`` (the top-level key returned
+    by /api/create-chart), one nested in ``chart_data``, or one rebuilt from
+    a ``chart`` object as returned by /api/create-chart.
+    """
+    if isinstance(visualization, dict) and visualization:
+        return visualization
+    if not isinstance(chart_data, dict):
+        return None
+    if isinstance(chart_data.get('visualization'), dict):
+        return chart_data['visualization']
+    if all(key in chart_data for key in ('type', 'labels', 'values', 'colors', 'title')):
+        return generate_chart_visualization(chart_data, chart_data['type'])
+    return None
+
+def build_chart_entry(chart_data, visualization=None):
+    """Build a chart history entry; the payload itself lives in the blob store"""
+    entry = {
+        'type': 'chart',
+        'chart_ref': chart_blobs.put(chart_data),
+        'timestamp': datetime.now().isoformat()
+    }
+    visualization = chart_visualization_for(chart_data, visualization)
+    if visualization:
+        entry['thumbnail_hash'] = chart_renderer.submit(visualization)
+    return entry
+
+def append_chat_history(chat_id, entries):
+    """Append entries to a chat's history file with a single read and write"""
+    chat_history_path = os.path.join(CHAT_HISTORY_DIR, f"chat_{chat_id}.json")
+    # Load existing history
+    if os.path.exists(chat_history_path):
+        with open(chat_history_path, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+    else:
+        history = []
+    history.extend(entries)
+    # Save back to file
+    with open(chat_history_path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, ensure_ascii=False, indent=2)
+
 @app.route('/api/chats', methods=['POST'])
 def create_chat():
     data = request.get_json()
@@ -632,39 +892,14 @@ def add_message(chat_id):
         chat.add_message(data['sender'], user_message)
         db.session.commit()
 
-        # Generate bot response using the same logic as /api/chat
-        if is_sql_query(user_message):
-            message_lower = user_message.lower().strip()
-            if not message_lower.startswith('select'):
-                bot_response = "Only SELECT queries are allowed for security reasons. Please start your query with SELECT."
-            else:
-                query_result = get_data_from_postgres(user_message)
-                if query_result is None:
-                    bot_response = "Failed to execute SQL query. Please check your syntax and try again."
-                elif len(query_result) == 0:
-                    bot_response = "Query executed successfully but returned no data."
-                else:
-                    bot_response = f"Great! I found {len(query_result)} records from your query. Please choose how you'd like to visualize this data:"
-        else:
-            bot_response = "Please enter a SQL query to fetch data from your PostgreSQL database. Here are some examples:\n\n• SELECT * FROM sales_table LIMIT 10\n• SELECT category, SUM(amount) as total FROM sales_table GROUP BY category\n• SELECT month, COUNT(*) as count FROM orders GROUP BY month\n\nI'll help you create beautiful visualizations once you provide the data!"
+        bot_response = generate_bot_response(user_message)
 
         # Store message and response in chat history JSON file
-        chat_history_path = os.path.join(CHAT_HISTORY_DIR, f"chat_{chat.id}.json")
-        # Load existing history
-        if os.path.exists(chat_history_path):
-            with open(chat_history_path, 'r', encoding='utf-8') as f:
-                history = json.load(f)
-        else:
-            history = []
-        # Append new entry
-        history.append({
+        append_chat_history(chat.id, [{
             'sender': data['sender'],
             'message': user_message,
             'response': bot_response
-        })
-        # Save back to file
-        with open(chat_history_path, 'w', encoding='utf-8') as f:
-            json.dump(history, f, ensure_ascii=False, indent=2)
+        }])
         return jsonify({
             'status': 'Message added',
             'chat_id': chat.id,
@@ -675,6 +910,86 @@ def add_message(chat_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def parse_chat_id(value):
+    """Coerce a chat id from JSON (int or numeric string) to int, or None if invalid"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return None
+
+@app.route('/api/chats/batch', methods=['POST'])
+def add_messages_batch():
+    """Ingest many messages and chart saves across one or more chats at once.
+
+    Each item is either ``{"chat_id", "sender", "message"}`` or
+    ``{"chat_id", "type": "chart", "chart_data", "visualization"}`` (with
+    ``visualization`` optional, as for save-chart). Every distinct message
+    is answered once, the database is committed once and each chat's
+    history file is rewritten once.
+    """
+    data = request.get_json()
+    items = data.get('items') if data else None
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'A non-empty list of items is required'}), 400
+
+    # Coerce chat ids up front so malformed items get a per-item error
+    item_chat_ids = [parse_chat_id(item.get('chat_id')) if isinstance(item, dict) else None for item in items]
+
+    results = []
+    entries_by_chat = {}
+    responses = {}
+    try:
+        chat_ids = {chat_id for chat_id in item_chat_ids if chat_id is not None}
+        chats = {chat.id: chat for chat in Chat.query.filter(Chat.id.in_(chat_ids)).all()} if chat_ids else {}
+        for index, (item, chat_id) in enumerate(zip(items, item_chat_ids)):
+            if not isinstance(item, dict):
+                results.append({'index': index, 'error': 'Item must be an object'})
+                continue
+            if chat_id is None:
+                results.append({'index': index, 'error': 'chat_id must be an integer'})
+                continue
+            chat = chats.get(chat_id)
+            if not chat:
+                results.append({'index': index, 'chat_id': chat_id, 'error': 'Chat not found'})
+                continue
+            if item.get('type') == 'chart':
+                entry = build_chart_entry(item.get('chart_data', {}), item.get('visualization'))
+                results.append({'index': index, 'status': 'Chart saved', 'chat_id': chat.id, 'chart_ref': entry['chart_ref']})
+            else:
+                if 'sender' not in item or 'message' not in item:
+                    results.append({'index': index, 'chat_id': chat_id, 'error': 'Sender and message are required'})
+                    continue
+                if not isinstance(item['sender'], str) or not isinstance(item['message'], str):
+                    results.append({'index': index, 'chat_id': chat_id, 'error': 'Sender and message must be strings'})
+                    continue
+                user_message = item['message']
+                chat.add_message(item['sender'], user_message)
+                key = user_message.strip()
+                if key not in responses:
+                    responses[key] = generate_bot_response(user_message)
+                entry = {
+                    'sender': item['sender'],
+                    'message': user_message,
+                    'response': responses[key]
+                }
+                results.append({'index': index, 'status': 'Message added', 'chat_id': chat.id, 'bot_response': responses[key]})
+            entries_by_chat.setdefault(chat.id, []).append(entry)
+        db.session.commit()
+
+        for chat_id, entries in entries_by_chat.items():
+            append_chat_history(chat_id, entries)
+        return jsonify({
+            'status': 'Batch processed',
+            'processed': sum(len(entries) for entries in entries_by_chat.values()),
+            'results': results
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/chats/<int:chat_id>', methods=['GET'])
 def get_chat(chat_id):
     chat = Chat.query.get(chat_id)
@@ -686,15 +1001,85 @@ def get_chat(chat_id):
         'chat_data': chat.chat_data
     })
 
+CHAT_LIST_DEFAULT_LIMIT = 50
+CHAT_LIST_MAX_LIMIT = 500
+
+def encode_chat_cursor(chat, sort):
+    """Encode the keyset position of the last chat on a page as an opaque cursor"""
+    position = f"{chat.updated_at.isoformat()}|{chat.id}" if sort == 'updated' else str(chat.id)
+    return base64.urlsafe_b64encode(position.encode('utf-8')).decode('ascii')
+
+def decode_chat_cursor(cursor, sort):
+    position = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+    if sort == 'updated':
+        updated_at, chat_id = position.split('|')
+        return datetime.fromisoformat(updated_at), int(chat_id)
+    return int(position)
+
+def filter_chats_by_prefix(query, prefix):
+    if not prefix:
+        return query
+    escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return query.filter(Chat.chat_name.like(f"{escaped}%", escape='\\'))
+
 @app.route('/api/chats', methods=['GET'])
 def list_chats():
-    chats = Chat.query.order_by(Chat.id.desc()).all()
-    return jsonify([{
-        'chat_id': chat.id,
-        'chat_name': chat.chat_name,
-        'created_at': chat.chat_data['created_at'],
-        'updated_at': chat.chat_data['updated_at']
-    } for chat in chats])
+    """List chats newest first, one keyset page at a time.
+
+    Query params: ``sort`` (``id`` or ``updated``), ``limit``, ``cursor`` (from
+    ``next_cursor`` of the previous page) and ``q`` (name prefix).
+    """
+    sort = request.args.get('sort', 'id')
+    if sort not in ('id', 'updated'):
+        return jsonify({'error': 'sort must be "id" or "updated"'}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', CHAT_LIST_DEFAULT_LIMIT)), 1), CHAT_LIST_MAX_LIMIT)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+
+    query = filter_chats_by_prefix(Chat.query, request.args.get('q', ''))
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            position = decode_chat_cursor(cursor, sort)
+        except (ValueError, UnicodeDecodeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        if sort == 'updated':
+            query = query.filter(tuple_(Chat.updated_at, Chat.id) < tuple_(*position))
+        else:
+            query = query.filter(Chat.id < position)
+
+    if sort == 'updated':
+        query = query.order_by(Chat.updated_at.desc(), Chat.id.desc())
+    else:
+        query = query.order_by(Chat.id.desc())
+    # Fetch one extra row to know whether another page exists
+    chats = query.limit(limit + 1).all()
+    has_more = len(chats) > limit
+    chats = chats[:limit]
+
+    return jsonify({
+        'chats': [{
+            'chat_id': chat.id,
+            'chat_name': chat.chat_name,
+            'created_at': chat.chat_data['created_at'],
+            'updated_at': chat.chat_data['updated_at']
+        } for chat in chats],
+        'next_cursor': encode_chat_cursor(chats[-1], sort) if has_more else None
+    })
+
+@app.route('/api/chats/count', methods=['GET'])
+def count_chats():
+    """Count chats, optionally by name prefix; ``estimate=1`` uses planner statistics"""
+    prefix = request.args.get('q', '')
+    if request.args.get('estimate') in ('1', 'true') and not prefix:
+        count = db.session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {'table': Chat.__tablename__}
+        ).scalar()
+        return jsonify({'count': max(int(count or 0), 0), 'estimate': True})
+    query = filter_chats_by_prefix(db.session.query(func.count(Chat.id)), prefix)
+    return jsonify({'count': query.scalar(), 'estimate': False})
 
 @app.route('/api/chats/<int:chat_id>/history', methods=['GET'])
 def get_chat_history(chat_id):
@@ -704,6 +1089,19 @@ def get_chat_history(chat_id):
     try:
         with open(chat_history_path, 'r', encoding='utf-8') as f:
             history = json.load(f)
+        # With ?thumbnails=1, rendered charts are sent as image URLs instead of full payloads
+        thumbnails_only = request.args.get('thumbnails') in ('1', 'true')
+        for entry in history:
+            if entry.get('type') != 'chart':
+                continue
+            chart_hash = entry.get('thumbnail_hash')
+            if chart_hash:
+                entry['thumbnails'] = thumbnail_urls(chart_hash)
+                if thumbnails_only and entry['thumbnails']:
+                    entry.pop('chart_data', None)
+                    continue
+            if 'chart_ref' in entry and 'chart_data' not in entry:
+                entry['chart_data'] = chart_blobs.get(entry['chart_ref'])
         return jsonify({'chat_id': chat_id, 'history': history})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -715,26 +1113,69 @@ def save_chart_to_history(chat_id):
     if not os.path.exists(chat_history_path):
         return jsonify({'error': 'Chat history not found'}), 404
     try:
-        with open(chat_history_path, 'r', encoding='utf-8') as f:
-            history = json.load(f)
-        # Add chart entry
-        history.append({
-            'type': 'chart',
-            'chart_data': data.get('chart_data', {}),
-            'timestamp': datetime.now().isoformat()
-        })
-        with open(chat_history_path, 'w', encoding='utf-8') as f:
-            json.dump(history, f, ensure_ascii=False, indent=2)
+        entry = build_chart_entry(data.get('chart_data', {}), data.get('visualization'))
+        append_chat_history(chat_id, [entry])
         return jsonify({'status': 'Chart saved'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/charts/thumbnails/<chart_hash>.<fmt>', methods=['GET'])
+def get_chart_thumbnail(chart_hash, fmt):
+    if fmt not in THUMBNAIL_FORMATS or not re.fullmatch(r'[0-9a-f]{64}', chart_hash):
+        return jsonify({'error': 'Invalid thumbnail'}), 400
+    if not chart_renderer.is_rendered(chart_hash, fmt):
+        return jsonify({'error': 'Thumbnail not found'}), 404
+    response = send_file(chart_renderer.path_for(chart_hash, fmt), max_age=31536000)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+def ensure_chat_indexes():
+    """Create Chat indexes that create_all skips on already existing tables"""
+    for index in Chat.__table__.indexes:
+        index.create(db.engine, checkfirst=True)
+
 @app.cli.command('init-db')
 def init_db():
     """Initialize the database."""
     db.create_all()
+    ensure_chat_indexes()
     print('Initialized the database.')
 
+@app.cli.command('compact-chart-history')
+def compact_chart_history():
+    """Move inline chart payloads into the blob store and queue missing thumbnails."""
+    moved = 0
+    queued = 0
+    for filename in os.listdir(CHAT_HISTORY_DIR):
+        if not filename.endswith('.json'):
+            continue
+        chat_history_path = os.path.join(CHAT_HISTORY_DIR, filename)
+        with open(chat_history_path, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+        changed = False
+        for entry in history:
+            if entry.get('type') != 'chart':
+                continue
+            if 'chart_data' in entry:
+                chart_data = entry.pop('chart_data')
+                entry['chart_ref'] = chart_blobs.put(chart_data)
+                changed = True
+                moved += 1
+            else:
+                chart_data = chart_blobs.get(entry.get('chart_ref', ''))
+            if 'thumbnail_hash' not in entry:
+                visualization = chart_visualization_for(chart_data)
+                if visualization:
+                    entry['thumbnail_hash'] = chart_renderer.submit(visualization)
+                    changed = True
+                    queued += 1
+        if changed:
+            with open(chat_history_path, 'w', encoding='utf-8') as f:
+                json.dump(history, f, ensure_ascii=False, indent=2)
+    print(f'Moved {moved} chart payloads to the blob store and queued {queued} thumbnails.')
+    # Let queued renders finish before the command exits
+    chart_renderer.executor.shutdown(wait=True)
+
 if __name__ == '__main__':
     print("Setting up ChartBot SQL Backend...")
     print("=" * 50)
@@ -749,6 +1190,7 @@ if __name__ == '__main__':
     # Initialize Flask database tables
     with app.app_context():
         db.create_all()
+        ensure_chat_indexes()
         print("SUCCESS: Flask database tables created!")
     
     print("\nStarting Flask server on http://localhost:5000...")
@@ -0,0 +1,112 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import plotly.graph_objects as go
+
+from chart_store import content_hash
+
+THUMBNAIL_FORMATS = ('png', 'svg')
+
+
+def visualization_hash(visualization):
+    """Stable content hash of a visualization payload"""
+    return content_hash(visualization)
+
+
+def visualization_to_figure(visualization):
+    """Convert a generate_chart_visualization payload into a plotly figure"""
+    chart_type = visualization.get('type', 'bar')
+    data = visualization.get('data', {})
+    datasets = data.get('datasets') or [{}]
+    dataset = datasets[0]
+    labels = data.get('labels', [])
+    title = dataset.get('label', '')
+
+    if chart_type == 'bar':
+        trace = go.Bar(x=labels, y=dataset.get('data', []), marker_color=dataset.get('backgroundColor'))
+    elif chart_type == 'line':
+        color = dataset.get('borderColor')
+        trace = go.Scatter(
+            x=labels,
+            y=dataset.get('data', []),
+            mode='lines+markers',
+            line={'color': color},
+            fill='tozeroy' if dataset.get('fill') else None
+        )
+    elif chart_type == 'pie':
+        trace = go.Pie(labels=labels, values=dataset.get('data', []), marker={'colors': dataset.get('backgroundColor')})
+    elif chart_type == 'scatter':
+        points = dataset.get('data', [])
+        trace = go.Scatter(
+            x=[p.get('x') for p in points],
+            y=[p.get('y') for p in points],
+            mode='markers',
+            marker={'color': dataset.get('backgroundColor')}
+        )
+    elif chart_type == 'table':
+        rows = data.get('rows', [])
+        trace = go.Table(
+            header={'values': data.get('headers', [])},
+            cells={'values': [list(col) for col in zip(*rows)] if rows else []}
+        )
+    elif chart_type == 'summary':
+        keys = ['count', 'total', 'average', 'minimum', 'maximum']
+        trace = go.Table(
+            header={'values': ['Statistic', 'Value']},
+            cells={'values': [keys, [data.get(key) for key in keys]]}
+        )
+        title = 'Summary Statistics'
+    else:
+        trace = go.Bar(x=labels, y=dataset.get('data', []))
+
+    fig = go.Figure(data=[trace])
+    fig.update_layout(title=title, margin={'l': 40, 'r': 20, 't': 50, 'b': 40})
+    return fig
+
+
+def render_visualization(visualization, path, fmt, width=480, height=320):
+    """Render a visualization to an image file (requires kaleido and Chrome)"""
+    fig = visualization_to_figure(visualization)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    fig.write_image(tmp_path, format=fmt, width=width, height=height)
+    os.replace(tmp_path, path)
+    return path
+
+
+class ChartRenderer:
+    """Render chart thumbnails in a worker pool, cached on disk by content hash"""
+
+    def __init__(self, cache_dir, max_workers=2):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='chart-render')
+        self.pending = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, chart_hash, fmt):
+        return os.path.join(self.cache_dir, f"{chart_hash}.{fmt}")
+
+    def is_rendered(self, chart_hash, fmt):
+        return os.path.exists(self.path_for(chart_hash, fmt))
+
+    def submit(self, visualization, formats=THUMBNAIL_FORMATS):
+        """Queue rendering for any missing formats and return the content hash"""
+        chart_hash = visualization_hash(visualization)
+        for fmt in formats:
+            key = (chart_hash, fmt)
+            with self._lock:
+                if self.is_rendered(chart_hash, fmt) or key in self.pending:
+                    continue
+                future = self.executor.submit(render_visualization, visualization, self.path_for(chart_hash, fmt), fmt)
+                self.pending[key] = future
+            # Outside the lock: the callback runs inline if the render already finished
+            future.add_done_callback(lambda f, key=key: self._finished(key, f))
+        return chart_hash
+
+    def _finished(self, key, future):
+        with self._lock:
+            self.pending.pop(key, None)
+        error = future.exception()
+        if error is not None:
+            print(f"Chart render error ({key[0]}.{key[1]}): {error}")
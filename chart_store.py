@@ -0,0 +1,67 @@
+import hashlib
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+
+def canonical_json(payload):
+    return json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def content_hash(payload):
+    """SHA-256 of the canonical JSON form of a payload"""
+    return hashlib.sha256(canonical_json(payload).encode('utf-8')).hexdigest()
+
+
+class ChartBlobStore:
+    """Content-addressed store of compressed chart payloads (hash -> blob)
+
+    Blobs are written once under ``<root>/<hash[:2]>/<hash>.json.z`` and never
+    modified, so saving the same chart twice costs only a reference. Recently
+    read payloads are kept in a small in-memory LRU cache.
+    """
+
+    def __init__(self, root, cache_size=256):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path_for(self, blob_hash):
+        return os.path.join(self.root, blob_hash[:2], f"{blob_hash}.json.z")
+
+    def exists(self, blob_hash):
+        return os.path.exists(self.path_for(blob_hash))
+
+    def put(self, payload):
+        """Store a payload if not already present and return its hash"""
+        data = canonical_json(payload).encode('utf-8')
+        blob_hash = hashlib.sha256(data).hexdigest()
+        path = self.path_for(blob_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(zlib.compress(data, 6))
+            os.replace(tmp_path, path)
+        return blob_hash
+
+    def get(self, blob_hash):
+        """Load a payload by hash, or None if it is missing"""
+        with self._lock:
+            if blob_hash in self._cache:
+                self._cache.move_to_end(blob_hash)
+                return self._cache[blob_hash]
+        path = self.path_for(blob_hash)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            payload = json.loads(zlib.decompress(f.read()).decode('utf-8'))
+        with self._lock:
+            self._cache[blob_hash] = payload
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return payload
@@ -10,6 +10,13 @@ class Chat(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Keyset pagination over (updated_at, id) for the chat list
+        db.Index('ix_chat_updated_at_id', 'updated_at', 'id'),
+        # text_pattern_ops lets LIKE 'prefix%' name searches use the index
+        db.Index('ix_chat_name_prefix', 'chat_name', postgresql_ops={'chat_name': 'text_pattern_ops'}),
+    )
+    
     @property
     def chat_data(self):
         return {
@@ -0,0 +1,299 @@
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+
+RESULT_ID_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+
+def _is_integer_value(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _column_kind(sample):
+    """Storage kind for a column from its non-null sample values"""
+    if not sample:
+        return 'text'
+    if all(_is_integer_value(v) for v in sample):
+        return 'integer'
+    if all(isinstance(v, float) for v in sample):
+        return 'float'
+    if all(isinstance(v, Decimal) for v in sample):
+        return 'decimal'
+    if all(isinstance(v, bool) for v in sample):
+        return 'boolean'
+    if all(isinstance(v, datetime) for v in sample):
+        return 'datetime'
+    if all(isinstance(v, date) and not isinstance(v, datetime) for v in sample):
+        return 'date'
+    return 'text'
+
+
+def _column_kinds(rows, columns):
+    """Classify columns by the Python type of their non-null sample values"""
+    return [_column_kind([row.get(col) for row in rows if row.get(col) is not None]) for col in columns]
+
+
+# Kinds stored as UTF-8 text, and how to turn the text back into the original value.
+# Decimals keep their exact digits and scale; dates use ISO format.
+TEXT_DECODERS = {
+    'text': None,
+    'decimal': Decimal,
+    'datetime': datetime.fromisoformat,
+    'date': date.fromisoformat,
+}
+
+COLUMN_FILES = {
+    'integer': ('i8', 'nul'),
+    'float': ('f8',),
+    'boolean': ('b1', 'nul'),
+    **{kind: ('bin', 'off', 'nul') for kind in TEXT_DECODERS},
+}
+
+
+class SpillWriter:
+    """Append row chunks to per-column files of a spilled result.
+
+    Integer and boolean columns are written as int64/bool plus a null mask,
+    float columns as float64 (None -> NaN), and text-like columns (text,
+    Decimal, date, datetime) as concatenated UTF-8 bytes plus int64 end
+    offsets and a null mask, so every file can be memory-mapped when reading
+    back and values round-trip exactly.
+    """
+
+    def __init__(self, path, sample_rows):
+        self.path = path
+        self.result_id = os.path.basename(path)
+        os.makedirs(path, exist_ok=True)
+        self.columns = list(sample_rows[0].keys())
+        self.kinds = _column_kinds(sample_rows, self.columns)
+        self.rows = 0
+        self._text_bytes = [0] * len(self.columns)
+        self._files = {}
+        for i, kind in enumerate(self.kinds):
+            for suffix in COLUMN_FILES[kind]:
+                self._files[(i, suffix)] = open(os.path.join(path, f"col_{i}.{suffix}"), 'wb')
+
+    def write(self, rows):
+        if not rows:
+            return
+        for i, (col, kind) in enumerate(zip(self.columns, self.kinds)):
+            values = [row.get(col) for row in rows]
+            if kind == 'float':
+                self._files[(i, 'f8')].write(np.asarray(values, dtype=np.float64).tobytes())
+                continue
+            nulls = np.fromiter((v is None for v in values), dtype=np.bool_, count=len(values))
+            self._files[(i, 'nul')].write(nulls.tobytes())
+            if kind == 'integer':
+                ints = np.fromiter((0 if v is None else v for v in values), dtype=np.int64, count=len(values))
+                self._files[(i, 'i8')].write(ints.tobytes())
+                continue
+            if kind == 'boolean':
+                bools = np.fromiter((bool(v) for v in values), dtype=np.bool_, count=len(values))
+                self._files[(i, 'b1')].write(bools.tobytes())
+                continue
+            if kind in ('date', 'datetime'):
+                encoded = [b'' if v is None else v.isoformat().encode('utf-8') for v in values]
+            else:
+                encoded = [b'' if v is None else str(v).encode('utf-8') for v in values]
+            lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+            offsets = self._text_bytes[i] + np.cumsum(lengths)
+            self._text_bytes[i] = int(offsets[-1])
+            self._files[(i, 'bin')].write(b''.join(encoded))
+            self._files[(i, 'off')].write(offsets.tobytes())
+        self.rows += len(rows)
+        # Keep an in-progress spill from looking idle to cleanup_expired
+        os.utime(self.path)
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        meta = {
+            'columns': self.columns,
+            'kinds': self.kinds,
+            'rows': self.rows,
+            'created_at': time.time()
+        }
+        with open(os.path.join(self.path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        return SpilledResult(self.path)
+
+
+def _memmap(path, dtype, length):
+    if length == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=(length,))
+
+
+class SpilledResult:
+    """Read-only, memory-mapped view of a spilled query result"""
+
+    def __init__(self, path):
+        self.path = path
+        self.result_id = os.path.basename(path)
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.columns = meta['columns']
+        self.kinds = dict(zip(meta['columns'], meta['kinds']))
+        self.row_count = meta['rows']
+
+    def _file(self, col, suffix):
+        return os.path.join(self.path, f"col_{self.columns.index(col)}.{suffix}")
+
+    def _nulls(self, col):
+        return _memmap(self._file(col, 'nul'), np.bool_, self.row_count)
+
+    def floats(self, col, start=0, stop=None):
+        """float64 copy of a column slice; nulls and non-numeric text become 0"""
+        kind = self.kinds[col]
+        if kind == 'float':
+            return np.nan_to_num(_memmap(self._file(col, 'f8'), np.float64, self.row_count)[start:stop], nan=0.0)
+        if kind == 'integer':
+            return _memmap(self._file(col, 'i8'), np.int64, self.row_count)[start:stop].astype(np.float64)
+        if kind == 'boolean':
+            return _memmap(self._file(col, 'b1'), np.bool_, self.row_count)[start:stop].astype(np.float64)
+        result = []
+        for value in self.values(col, start, stop):
+            try:
+                result.append(float(value))
+            except (ValueError, TypeError):
+                result.append(0.0)
+        return np.asarray(result, dtype=np.float64)
+
+    def values(self, col, start=0, stop=None):
+        """Python values of a column slice (None for nulls)"""
+        stop = self.row_count if stop is None else min(stop, self.row_count)
+        if start >= stop:
+            return []
+        kind = self.kinds[col]
+        if kind == 'float':
+            chunk = _memmap(self._file(col, 'f8'), np.float64, self.row_count)[start:stop]
+            return [None if np.isnan(v) else float(v) for v in chunk]
+        if kind == 'integer':
+            chunk = _memmap(self._file(col, 'i8'), np.int64, self.row_count)[start:stop]
+            nulls = self._nulls(col)[start:stop]
+            return [None if is_null else int(v) for v, is_null in zip(chunk, nulls)]
+        if kind == 'boolean':
+            chunk = _memmap(self._file(col, 'b1'), np.bool_, self.row_count)[start:stop]
+            nulls = self._nulls(col)[start:stop]
+            return [None if is_null else bool(v) for v, is_null in zip(chunk, nulls)]
+        decode = TEXT_DECODERS[kind]
+        offsets = _memmap(self._file(col, 'off'), np.int64, self.row_count)
+        nulls = self._nulls(col)
+        total_bytes = int(offsets[-1])
+        data = _memmap(self._file(col, 'bin'), np.uint8, total_bytes)
+        begin = int(offsets[start - 1]) if start > 0 else 0
+        raw = data[begin:int(offsets[stop - 1])].tobytes()
+        result = []
+        position = 0
+        for end, is_null in zip(offsets[start:stop], nulls[start:stop]):
+            end = int(end) - begin
+            if is_null:
+                result.append(None)
+            else:
+                text = raw[position:end].decode('utf-8')
+                result.append(decode(text) if decode else text)
+            position = end
+        return result
+
+    def rows(self, start=0, stop=None):
+        columns = [self.values(col, start, stop) for col in self.columns]
+        return [dict(zip(self.columns, values)) for values in zip(*columns)]
+
+    def iter_chunks(self, chunk_size=5000):
+        """Yield the result as chunks of row dicts"""
+        for start in range(0, self.row_count, chunk_size):
+            yield self.rows(start, start + chunk_size)
+
+    def group_sum(self, label_col, value_col, max_groups, chunk_size=50000):
+        """Sum a value column per distinct label, reading the columns chunk by chunk.
+
+        Returns ``(labels, sums)`` in first-seen label order, or None once more
+        than ``max_groups`` distinct labels appear.
+        """
+        sums = {}
+        for start in range(0, self.row_count, chunk_size):
+            labels = np.asarray([str(label) for label in self.values(label_col, start, start + chunk_size)], dtype=object)
+            values = self.floats(value_col, start, start + chunk_size)
+            uniques, first_index, inverse = np.unique(labels, return_index=True, return_inverse=True)
+            chunk_sums = np.bincount(inverse, weights=values, minlength=uniques.size)
+            for i in np.argsort(first_index, kind='stable'):
+                sums[uniques[i]] = sums.get(uniques[i], 0.0) + float(chunk_sums[i])
+            if len(sums) > max_groups:
+                return None
+        return list(sums.keys()), list(sums.values())
+
+    def bucket_means(self, label_col, value_col, buckets, chunk_size=50000):
+        """Average a value column over ``buckets`` equal runs of consecutive rows.
+
+        Each bucket is labelled with the label of its first row.
+        """
+        buckets = max(1, min(buckets, self.row_count))
+        edges = np.linspace(0, self.row_count, buckets + 1).astype(np.int64)
+        sums = np.zeros(buckets, dtype=np.float64)
+        for start in range(0, self.row_count, chunk_size):
+            values = self.floats(value_col, start, start + chunk_size)
+            bucket_ids = np.searchsorted(edges, np.arange(start, start + values.size), side='right') - 1
+            sums += np.bincount(bucket_ids, weights=values, minlength=buckets)
+        labels = [str(self.values(label_col, int(edge), int(edge) + 1)[0]) for edge in edges[:-1]]
+        return labels, (sums / np.diff(edges)).tolist()
+
+
+class SpillStore:
+    """Directory of spilled results, one subdirectory per result ID, expired after ``ttl`` seconds idle"""
+
+    def __init__(self, root, ttl=3600):
+        self.root = root
+        self.ttl = ttl
+        os.makedirs(root, exist_ok=True)
+        # Drop spills left over from a previous run
+        self.cleanup_expired()
+
+    def start_cleanup_timer(self, interval=300):
+        """Run cleanup_expired every ``interval`` seconds on a daemon timer"""
+        def run():
+            self.cleanup_expired()
+            self.start_cleanup_timer(interval)
+
+        timer = threading.Timer(interval, run)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def writer(self, sample_rows):
+        self.cleanup_expired()
+        return SpillWriter(os.path.join(self.root, uuid.uuid4().hex), sample_rows)
+
+    def open(self, result_id):
+        if not result_id or not RESULT_ID_PATTERN.fullmatch(result_id):
+            return None
+        self.cleanup_expired()
+        path = os.path.join(self.root, result_id)
+        if not os.path.exists(os.path.join(path, 'meta.json')):
+            return None
+        # Reading a result keeps it alive for another ttl
+        os.utime(path)
+        return SpilledResult(path)
+
+    def discard(self, result_id):
+        if result_id and RESULT_ID_PATTERN.fullmatch(result_id):
+            shutil.rmtree(os.path.join(self.root, result_id), ignore_errors=True)
+
+    def cleanup_expired(self):
+        cutoff = time.time() - self.ttl
+        if not os.path.isdir(self.root):
+            return
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                continue
@@ -9,6 +9,7 @@ export class ChatService {
   private apiUrl = 'http://localhost:5000/api';
   private pendingData = signal<any[]>([]);
   private pendingQuery = signal<string>('');
+  private pendingResultId = signal<string | null>(null); // Set when the backend spilled an oversized result
   private currentSessionId = signal<string | null>(null); // Track current session
 
   constructor(private http: HttpClient) {}
@@ -30,6 +31,7 @@ export class ChatService {
           if (response.success && response.type === 'sql_result') {
             this.pendingData.set(response.data || []);
             this.pendingQuery.set(response.query || '');
+            this.pendingResultId.set(response.result_id || null);
           } else if (!response.success) {
             console.warn('Non-success response:', response.message);
           }
@@ -48,6 +50,7 @@ export class ChatService {
       data: this.pendingData(),
       chartType,
       query: this.pendingQuery(),
+      result_id: this.pendingResultId(), // Lets the backend chart the full spilled result, not the preview
       session_id: this.currentSessionId(), // Include session ID if available
     };
 
@@ -58,6 +61,7 @@ export class ChatService {
           if (response.success) {
             this.pendingData.set([]);
             this.pendingQuery.set('');
+            this.pendingResultId.set(null);
           }
         }),
         catchError((error) => {
@@ -81,5 +85,6 @@ export class ChatService {
   clearPending(): void {
     this.pendingData.set([]);
     this.pendingQuery.set('');
+    this.pendingResultId.set(null);
   }
 }
\ No newline at end of file
@@ -0,0 +1,244 @@
+import numpy as np
+
+
+class ColumnProfile:
+    """Streaming, mergeable summary statistics for one numeric column.
+
+    Chunks are folded in with ``update`` and partial profiles (e.g. from
+    different cursor batches or workers) are combined with ``merge``.
+    Mean/variance use Chan's parallel update, quantiles and histograms come
+    from a weighted sample sketch that is exact until it exceeds
+    ``sketch_size`` points, and top-k is kept with ``np.argpartition``.
+    """
+
+    def __init__(self, name, top_k=3, sketch_size=4096):
+        self.name = name
+        self.top_k = top_k
+        self.sketch_size = sketch_size
+        self.count = 0
+        self.nulls = 0
+        # +/-Infinity values (e.g. from double precision columns), kept out of the stats
+        self.nonfinite = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = None
+        self.maximum = None
+        # Rows seen so far (including nulls), used as labels when none are given
+        self.rows_seen = 0
+        self._sketch_values = np.empty(0, dtype=np.float64)
+        self._sketch_weights = np.empty(0, dtype=np.float64)
+        self._top_values = np.empty(0, dtype=np.float64)
+        self._top_labels = np.empty(0, dtype=object)
+
+    def update(self, values, labels=None):
+        """Fold a chunk of values (and optional row labels) into the profile"""
+        values = np.asarray(values, dtype=np.float64)
+        offset = self.rows_seen
+        self.rows_seen += int(values.size)
+        nan = np.isnan(values)
+        valid = np.isfinite(values)
+        self.nulls += int(np.count_nonzero(nan))
+        self.nonfinite += int(values.size - np.count_nonzero(valid) - np.count_nonzero(nan))
+        if labels is None:
+            # Global row positions, so labels stay unique across chunks
+            labels = np.arange(offset, offset + valid.size)[valid]
+        else:
+            labels = np.asarray(labels, dtype=object)[valid]
+        values = values[valid]
+        if values.size == 0:
+            return self
+
+        chunk = ColumnProfile(self.name, self.top_k, self.sketch_size)
+        chunk.count = int(values.size)
+        chunk.total = float(values.sum())
+        chunk.mean = chunk.total / chunk.count
+        chunk.m2 = float(np.square(values - chunk.mean).sum())
+        chunk.minimum = float(values.min())
+        chunk.maximum = float(values.max())
+        chunk._sketch_values = values
+        chunk._sketch_weights = np.ones(values.size, dtype=np.float64)
+        chunk._top_values = values
+        chunk._top_labels = labels
+        chunk._trim()
+        return self.merge(chunk)
+
+    def merge(self, other):
+        """Combine another profile of the same column into this one"""
+        self.nulls += other.nulls
+        self.nonfinite += other.nonfinite
+        self.rows_seen += other.rows_seen
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.total = other.count, other.total
+            self.mean, self.m2 = other.mean, other.m2
+            self.minimum, self.maximum = other.minimum, other.maximum
+        else:
+            count = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self.m2 += other.m2 + delta * delta * self.count * other.count / count
+            self.count = count
+            self.total += other.total
+            self.minimum = min(self.minimum, other.minimum)
+            self.maximum = max(self.maximum, other.maximum)
+
+        self._sketch_values = np.concatenate([self._sketch_values, other._sketch_values])
+        self._sketch_weights = np.concatenate([self._sketch_weights, other._sketch_weights])
+        self._top_values = np.concatenate([self._top_values, other._top_values])
+        self._top_labels = np.concatenate([self._top_labels, other._top_labels])
+        self._trim()
+        return self
+
+    def _trim(self):
+        # Top-k via partial selection instead of a full sort
+        if self._top_values.size > self.top_k:
+            keep = np.argpartition(-self._top_values, self.top_k - 1)[:self.top_k]
+            self._top_values = self._top_values[keep]
+            self._top_labels = self._top_labels[keep]
+
+        # Compress the sketch to evenly spaced points of the weighted CDF
+        if self._sketch_values.size > self.sketch_size:
+            order = np.argsort(self._sketch_values, kind='stable')
+            values = self._sketch_values[order]
+            cumulative = np.cumsum(self._sketch_weights[order])
+            total_weight = cumulative[-1]
+            step = total_weight / self.sketch_size
+            targets = (np.arange(self.sketch_size) + 0.5) * step
+            idx = np.searchsorted(cumulative, targets)
+            self._sketch_values = values[np.minimum(idx, values.size - 1)]
+            self._sketch_weights = np.full(self.sketch_size, step)
+
+    def quantiles(self, qs=(0.25, 0.5, 0.75)):
+        """Return quantiles of the column (exact until the sketch compresses)"""
+        if self.count == 0:
+            return {str(q): None for q in qs}
+        order = np.argsort(self._sketch_values, kind='stable')
+        values = self._sketch_values[order]
+        weights = self._sketch_weights[order]
+        # Midpoint plotting positions, matching linear interpolation for unit weights
+        positions = (np.cumsum(weights) - weights) / max(weights.sum() - weights[-1], 1e-12)
+        result = np.interp(qs, positions, values)
+        return {str(q): float(v) for q, v in zip(qs, result)}
+
+    def histogram(self, bins=10):
+        """Return equal-width histogram counts over [minimum, maximum]"""
+        if self.count == 0:
+            return {"edges": [], "counts": []}
+        counts, edges = np.histogram(
+            self._sketch_values,
+            bins=bins,
+            range=(self.minimum, self.maximum),
+            weights=self._sketch_weights
+        )
+        return {
+            "edges": [float(e) for e in edges],
+            "counts": [int(round(c)) for c in counts]
+        }
+
+    def top(self):
+        """Return the top-k (label, value) pairs, largest first"""
+        order = np.argsort(-self._top_values, kind='stable')
+        return [(_to_native(self._top_labels[i]), float(self._top_values[i])) for i in order]
+
+    def to_dict(self, bins=10):
+        std = float(np.sqrt(self.m2 / self.count)) if self.count else None
+        return {
+            "count": self.count,
+            "nulls": self.nulls,
+            "nonfinite": self.nonfinite,
+            "total": self.total,
+            "mean": self.mean if self.count else None,
+            "stddev": std,
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+            "quantiles": self.quantiles(),
+            "histogram": self.histogram(bins),
+            "top": self.top()
+        }
+
+
+def _to_native(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _numeric_array(values):
+    """Convert a column to float64 (None -> NaN), or None if it is not numeric"""
+    if any(isinstance(v, bool) for v in values):
+        return None
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return None
+
+
+class DataProfiler:
+    """Profile every numeric column of row dicts, one chunk at a time.
+
+    A column is treated as numeric while every chunk seen so far converts
+    cleanly to float; the first chunk that doesn't drops it from the result.
+    """
+
+    def __init__(self, label_column=None, top_k=3, sketch_size=4096):
+        self.label_column = label_column
+        self.top_k = top_k
+        self.sketch_size = sketch_size
+        self.profiles = {}
+        self.rejected = set()
+        self.rows = 0
+
+    def update(self, rows):
+        if not rows:
+            return self
+        offset = self.rows
+        self.rows += len(rows)
+        if self.label_column is not None:
+            labels = [str(row.get(self.label_column, '')) for row in rows]
+        else:
+            # Without a label column, top-k reports global row numbers
+            labels = np.arange(offset, self.rows)
+
+        for col in rows[0].keys():
+            if col in self.rejected or col == self.label_column:
+                continue
+            values = _numeric_array([row.get(col) for row in rows])
+            if values is None:
+                self.rejected.add(col)
+                self.profiles.pop(col, None)
+                continue
+            profile = self.profiles.get(col)
+            if profile is None:
+                profile = self.profiles[col] = ColumnProfile(col, self.top_k, self.sketch_size)
+            profile.update(values, labels)
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.rejected |= other.rejected
+        for col, profile in other.profiles.items():
+            if col in self.rejected:
+                continue
+            if col in self.profiles:
+                self.profiles[col].merge(profile)
+            else:
+                self.profiles[col] = profile
+        for col in self.rejected:
+            self.profiles.pop(col, None)
+        return self
+
+    def to_dict(self, bins=10):
+        return {
+            "rows": self.rows,
+            "columns": {col: profile.to_dict(bins) for col, profile in self.profiles.items()}
+        }
+
+
+def profile_chunks(chunks, label_column=None, top_k=3, bins=10):
+    """Profile an iterable of row-dict chunks (e.g. server-side cursor batches)"""
+    profiler = DataProfiler(label_column=label_column, top_k=top_k)
+    for chunk in chunks:
+        profiler.update(chunk)
+    return profiler.to_dict(bins)
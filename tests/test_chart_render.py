@@ -0,0 +1,99 @@
+import threading
+
+import plotly.graph_objects as go
+import pytest
+
+import chart_render
+from chart_render import ChartRenderer, visualization_hash, visualization_to_figure
+
+BAR = {
+    'type': 'bar',
+    'data': {
+        'labels': ['a', 'b'],
+        'datasets': [{'label': 'Bar Chart: amount by name', 'data': [1, 2], 'backgroundColor': ['#6366f1', '#8b5cf6']}]
+    }
+}
+
+
+@pytest.mark.parametrize('visualization, trace_type', [
+    (BAR, go.Bar),
+    ({'type': 'line', 'data': {'labels': ['a'], 'datasets': [{'data': [1], 'borderColor': '#6366f1'}]}}, go.Scatter),
+    ({'type': 'pie', 'data': {'labels': ['a', 'b'], 'datasets': [{'data': [1, 2]}]}}, go.Pie),
+    ({'type': 'scatter', 'data': {'datasets': [{'data': [{'x': 0, 'y': 1}, {'x': 1, 'y': 3}]}]}}, go.Scatter),
+    ({'type': 'table', 'data': {'headers': ['Category', 'Value'], 'rows': [['a', 1], ['b', 2]]}}, go.Table),
+    ({'type': 'summary', 'data': {'count': 2, 'total': 3, 'average': 1.5, 'minimum': 1, 'maximum': 2}}, go.Table),
+])
+def test_visualization_to_figure_handles_each_chart_type(visualization, trace_type):
+    fig = visualization_to_figure(visualization)
+
+    assert len(fig.data) == 1
+    assert isinstance(fig.data[0], trace_type)
+
+
+def test_figure_carries_payload_values():
+    bar = visualization_to_figure(BAR).data[0]
+    assert list(bar.x) == ['a', 'b'] and list(bar.y) == [1, 2]
+
+    area = visualization_to_figure({
+        'type': 'line',
+        'data': {'labels': ['a'], 'datasets': [{'data': [1], 'borderColor': '#000', 'fill': True}]}
+    }).data[0]
+    assert area.fill == 'tozeroy'
+
+    scatter = visualization_to_figure({'type': 'scatter', 'data': {'datasets': [{'data': [{'x': 0, 'y': 5}]}]}}).data[0]
+    assert list(scatter.x) == [0] and list(scatter.y) == [5]
+
+    table = visualization_to_figure({'type': 'table', 'data': {'headers': ['h1', 'h2'], 'rows': [['a', 1], ['b', 2]]}}).data[0]
+    assert [list(col) for col in table.cells.values] == [['a', 'b'], [1, 2]]
+
+
+def test_hash_is_independent_of_key_order():
+    reordered = {'data': BAR['data'], 'type': 'bar'}
+    assert visualization_hash(reordered) == visualization_hash(BAR)
+
+
+def test_submit_renders_each_format_once(tmp_path, monkeypatch):
+    release = threading.Event()
+    calls = []
+    lock = threading.Lock()
+
+    def fake_render(visualization, path, fmt):
+        with lock:
+            calls.append(fmt)
+        release.wait(5)
+        with open(path, 'w') as f:
+            f.write(fmt)
+        return path
+
+    monkeypatch.setattr(chart_render, 'render_visualization', fake_render)
+    renderer = ChartRenderer(str(tmp_path), max_workers=4)
+
+    threads = [threading.Thread(target=renderer.submit, args=(BAR,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    release.set()
+    renderer.executor.shutdown(wait=True)
+
+    chart_hash = visualization_hash(BAR)
+    assert sorted(calls) == ['png', 'svg']
+    assert renderer.is_rendered(chart_hash, 'png') and renderer.is_rendered(chart_hash, 'svg')
+    assert renderer.pending == {}
+
+    # Already cached: nothing is queued again
+    assert ChartRenderer(str(tmp_path)).submit(BAR) == chart_hash
+    assert sorted(calls) == ['png', 'svg']
+
+
+def test_failed_render_is_not_cached(tmp_path, monkeypatch):
+    def failing_render(visualization, path, fmt):
+        raise RuntimeError('no chrome')
+
+    monkeypatch.setattr(chart_render, 'render_visualization', failing_render)
+    renderer = ChartRenderer(str(tmp_path))
+    chart_hash = renderer.submit(BAR, formats=('png',))
+    renderer.executor.shutdown(wait=True)
+
+    assert not renderer.is_rendered(chart_hash, 'png')
+    assert renderer.pending == {}
@@ -0,0 +1,40 @@
+import os
+import zlib
+
+from chart_store import ChartBlobStore, canonical_json, content_hash
+
+
+def test_put_get_round_trip(tmp_path):
+    store = ChartBlobStore(str(tmp_path))
+    payload = {'labels': ['a', 'é'], 'values': [1.5, 2], 'sqlQuery': 'SELECT 1'}
+
+    blob_hash = store.put(payload)
+
+    assert blob_hash == content_hash(payload)
+    assert store.exists(blob_hash)
+    # A fresh store reads from disk rather than the LRU cache
+    assert ChartBlobStore(str(tmp_path)).get(blob_hash) == payload
+    with open(store.path_for(blob_hash), 'rb') as f:
+        assert zlib.decompress(f.read()).decode('utf-8') == canonical_json(payload)
+
+
+def test_identical_payloads_are_stored_once(tmp_path):
+    store = ChartBlobStore(str(tmp_path))
+
+    first = store.put({'b': 1, 'a': [1, 2]})
+    second = store.put({'a': [1, 2], 'b': 1})
+
+    assert first == second
+    blobs = [name for _, _, files in os.walk(tmp_path) for name in files]
+    assert blobs == [f"{first}.json.z"]
+
+
+def test_missing_blob_and_cache_eviction(tmp_path):
+    store = ChartBlobStore(str(tmp_path), cache_size=2)
+    hashes = [store.put({'n': n}) for n in range(3)]
+
+    for blob_hash in hashes:
+        store.get(blob_hash)
+
+    assert list(store._cache) == hashes[1:]
+    assert store.get('0' * 64) is None
@@ -0,0 +1,93 @@
+import os
+import time
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from result_spill import SpillStore
+
+ROWS = [
+    {'id': 1, 'big': 2 ** 53 + 1, 'amount': Decimal('10.50'), 'ratio': 0.5, 'name': 'Laptop',
+     'active': True, 'day': date(2024, 1, 31), 'at': datetime(2024, 1, 31, 9, 30, tzinfo=timezone.utc)},
+    {'id': 2, 'big': None, 'amount': None, 'ratio': 1.25, 'name': None,
+     'active': None, 'day': None, 'at': None},
+    {'id': 3, 'big': -(2 ** 62), 'amount': Decimal('12345678901234567890.123456789'), 'ratio': None, 'name': '',
+     'active': False, 'day': date(1999, 12, 1), 'at': datetime(1999, 12, 1, 23, 59, 59, 123456)},
+    {'id': 4, 'big': 7, 'amount': Decimal('-1.25'), 'ratio': 2.0, 'name': 'Überraschung ✓',
+     'active': True, 'day': date(2000, 2, 29), 'at': datetime(2000, 2, 29)},
+    {'id': 5, 'big': 0, 'amount': Decimal('8'), 'ratio': 3.5, 'name': 'Mouse',
+     'active': False, 'day': date(2024, 6, 1), 'at': datetime(2024, 6, 1, 12)},
+]
+
+
+def spill(store, rows, chunk=2):
+    writer = store.writer(rows[:chunk])
+    for start in range(0, len(rows), chunk):
+        writer.write(rows[start:start + chunk])
+    return writer.close()
+
+
+def test_round_trip_preserves_types_and_nulls(tmp_path):
+    result = spill(SpillStore(str(tmp_path)), ROWS)
+
+    assert result.kinds == {
+        'id': 'integer', 'big': 'integer', 'amount': 'decimal', 'ratio': 'float', 'name': 'text',
+        'active': 'boolean', 'day': 'date', 'at': 'datetime',
+    }
+    rows = result.rows()
+    assert rows == ROWS
+    assert all(type(row['id']) is int for row in rows)
+    assert [str(row['amount']) for row in rows if row['amount'] is not None] == [
+        '10.50', '12345678901234567890.123456789', '-1.25', '8'
+    ]
+    assert result.floats('amount').tolist() == [10.5, 0.0, 1.2345678901234567e19, -1.25, 8.0]
+    assert result.floats('active').tolist() == [1.0, 0.0, 0.0, 1.0, 0.0]
+
+
+def test_slices_decode_text_offsets(tmp_path):
+    result = spill(SpillStore(str(tmp_path)), ROWS)
+
+    for start in range(len(ROWS)):
+        for stop in range(start, len(ROWS) + 2):
+            assert result.values('name', start, stop) == [row['name'] for row in ROWS[start:stop]]
+    chunks = list(result.iter_chunks(chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert [row for chunk in chunks for row in chunk] == result.rows()
+
+
+def test_group_sum_and_bucket_means_match_numpy(tmp_path):
+    rng = np.random.default_rng(0)
+    labels = rng.choice(['a', 'b', 'c', 'd'], 1000)
+    values = rng.integers(0, 100, 1000)
+    rows = [{'label': str(l), 'value': int(v)} for l, v in zip(labels, values)]
+    result = spill(SpillStore(str(tmp_path)), rows, chunk=300)
+
+    names, sums = result.group_sum('label', 'value', max_groups=10, chunk_size=128)
+    first_seen = list(dict.fromkeys(labels.tolist()))
+    assert names == first_seen
+    assert sums == [float(values[labels == name].sum()) for name in first_seen]
+    assert result.group_sum('label', 'value', max_groups=3) is None
+
+    bucket_labels, means = result.bucket_means('label', 'value', buckets=7, chunk_size=128)
+    edges = np.linspace(0, 1000, 8).astype(np.int64)
+    assert means == pytest.approx([values[a:b].mean() for a, b in zip(edges[:-1], edges[1:])])
+    assert bucket_labels == [str(labels[edge]) for edge in edges[:-1]]
+
+
+def test_expired_results_are_cleaned_up(tmp_path):
+    store = SpillStore(str(tmp_path), ttl=60)
+    old = spill(store, ROWS)
+    fresh = spill(store, ROWS)
+    stale = time.time() - 120
+    os.utime(old.path, (stale, stale))
+
+    assert store.open(fresh.result_id) is not None
+    assert not os.path.exists(old.path)
+    assert store.open(old.result_id) is None
+    assert store.open('../etc') is None
+
+    os.utime(fresh.path, (stale, stale))
+    SpillStore(str(tmp_path), ttl=60)
+    assert not os.path.exists(fresh.path)
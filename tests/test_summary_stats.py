@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from summary_stats import ColumnProfile, DataProfiler, profile_chunks
+
+
+def test_profile_matches_numpy_reference():
+    values = np.random.default_rng(0).normal(50, 10, 1000)
+    stats = ColumnProfile('x').update(values).to_dict()
+
+    assert stats['count'] == 1000
+    assert stats['mean'] == pytest.approx(values.mean())
+    assert stats['stddev'] == pytest.approx(values.std())
+    assert stats['minimum'] == values.min()
+    assert stats['maximum'] == values.max()
+    expected = np.quantile(values, [0.25, 0.5, 0.75])
+    assert list(stats['quantiles'].values()) == pytest.approx(expected)
+    counts, edges = np.histogram(values, bins=10)
+    assert stats['histogram']['counts'] == counts.tolist()
+    assert stats['histogram']['edges'] == pytest.approx(edges)
+
+
+def test_chunked_updates_and_merge_match_single_pass():
+    values = np.random.default_rng(1).exponential(3, 3000)
+    whole = ColumnProfile('x').update(values)
+
+    chunked = ColumnProfile('x')
+    for chunk in np.array_split(values, 7):
+        chunked.update(chunk)
+
+    left = ColumnProfile('x').update(values[:1200])
+    right = ColumnProfile('x').update(values[1200:])
+    merged = left.merge(right)
+
+    for profile in (chunked, merged):
+        assert profile.count == whole.count
+        assert profile.mean == pytest.approx(whole.mean)
+        assert profile.m2 == pytest.approx(whole.m2)
+        assert profile.quantiles() == pytest.approx(whole.quantiles())
+
+
+def test_compressed_sketch_stays_close_to_exact_quantiles():
+    values = np.random.default_rng(2).uniform(0, 100, 50000)
+    profile = ColumnProfile('x', sketch_size=512)
+    for chunk in np.array_split(values, 20):
+        profile.update(chunk)
+
+    assert profile._sketch_values.size <= 512
+    expected = np.quantile(values, [0.25, 0.5, 0.75])
+    assert list(profile.quantiles().values()) == pytest.approx(expected, abs=1.0)
+    assert sum(profile.histogram()['counts']) == pytest.approx(values.size, rel=0.01)
+
+
+def test_nulls_and_top_k_with_global_row_numbers():
+    profile = ColumnProfile('x')
+    profile.update([1, None, 5])
+    profile.update([9, 2])
+
+    assert profile.nulls == 1
+    assert profile.count == 4
+    assert profile.top() == [(3, 9.0), (2, 5.0), (4, 2.0)]
+
+
+def test_top_k_uses_label_column():
+    rows = [
+        {'name': 'a', 'amount': 3, 'qty': 1},
+        {'name': 'b', 'amount': 7, 'qty': 2},
+        {'name': 'c', 'amount': 5, 'qty': None},
+        {'name': 'd', 'amount': 1, 'qty': 4},
+    ]
+    profile = profile_chunks([rows[:2], rows[2:]], label_column='name', top_k=2)
+
+    assert set(profile['columns']) == {'amount', 'qty'}
+    assert profile['columns']['amount']['top'] == [('b', 7.0), ('c', 5.0)]
+    assert profile['columns']['qty']['nulls'] == 1
+
+
+def test_non_numeric_columns_are_dropped():
+    profiler = DataProfiler()
+    profiler.update([{'v': 1, 's': 2}, {'v': 2, 's': 3}])
+    profiler.update([{'v': 3, 's': 'text'}])
+
+    assert set(profiler.profiles) == {'v'}
+    assert profiler.rows == 3
+
+
+def test_infinite_values_are_counted_not_profiled():
+    profile = ColumnProfile('x')
+    profile.update([1.0, float('inf'), None, 3.0])
+    profile.update([float('-inf'), 5.0])
+    stats = profile.to_dict()
+
+    assert stats['count'] == 3
+    assert stats['nulls'] == 1
+    assert stats['nonfinite'] == 2
+    assert stats['maximum'] == 5.0
+    assert stats['mean'] == pytest.approx(3.0)
+    assert sum(stats['histogram']['counts']) == 3